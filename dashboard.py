@@ -4,11 +4,13 @@ Daily Sales Dashboard
 """
 
 import os
+import hashlib
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from data_loader import load_all_reports
+from plotly.colors import qualitative
+from data_loader import CACHE_FORMAT, load_all_reports, report_files
 
 # ───────────────────────── Page Config ─────────────────────────
 st.set_page_config(
@@ -40,6 +42,11 @@ st.markdown("""
         letter-spacing: 1px;
         opacity: 0.8;
     }
+    .kpi-row {
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 12px;
+    }
     .kpi-delta-pos { color: #00d26a; font-size: 16px; font-weight: 600; }
     .kpi-delta-neg { color: #ff4757; font-size: 16px; font-weight: 600; }
     .section-header {
@@ -62,18 +69,127 @@ COLORS = {
     'ly': '#95a5a6',
 }
 
-STORE_COLORS = px.colors.qualitative.Set2
+STORE_COLORS = qualitative.Set2
+
+# Shared chart margin. It has to sit on each figure's own layout: with
+# theme="streamlit", st.plotly_chart overwrites template margins with its own.
+CHART_MARGIN = dict(l=20, r=20, t=10, b=20)
+# Longest line trace sent as-is; beyond this, store_line_figure downsamples
+# (plotly-resampler's default_n_shown_samples)
+RESAMPLE_POINTS = 1000
+
+# Column prefix → display label for the long-form channel / platform charts
+CHANNEL_LABELS = {
+    'dine_in': 'Dine In',
+    'carry_out': 'Carry Out',
+    'delivery': 'Delivery',
+    'drive_thru': 'Drive Thru',
+}
+PLATFORM_LABELS = {
+    'doordash': 'DoorDash',
+    'ubereats': 'UberEats',
+    'grubhub': 'GrubHub',
+    'eatstreet': 'EatStreet',
+    'ezcater': 'EZ Cater',
+}
+PERIOD_LABELS = {'day': 'Day', 'wtd': 'WTD', 'ptd': 'PTD'}
 
 # ───────────────────────── Data Loading ─────────────────────────
 FOLDER = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(FOLDER, '.cache')
+DATA_KEYS = ('sales', 'brand_totals', 'transactions', 'channels', 'labor')
+# Bump whenever load_all_reports or downcast_numeric change the frames they
+# produce, so the Parquet copies in CACHE_DIR are rebuilt
+PARQUET_FORMAT = 1
+
+
+def reports_signature():
+    """
+    Hash of report file names, sizes and mtimes plus the loader and Parquet
+    format versions; changes whenever a report or the frames built from it do.
+    """
+    digest = hashlib.sha1(f"loader:{CACHE_FORMAT}:parquet:{PARQUET_FORMAT}\n".encode())
+    for path, stat in report_files(FOLDER):
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def downcast_numeric(df):
+    """
+    Downcast float64 columns to float32 when every value survives the round
+    trip exactly, and int columns to the smallest int dtype that holds them.
+    """
+    # pd.to_numeric(downcast='float') tolerates small changes, which can flip
+    # the rounding of displayed cents, so demand an exact round trip instead
+    for col in df.select_dtypes('float64').columns:
+        narrow = df[col].astype(np.float32)
+        if np.array_equal(narrow.to_numpy(np.float64), df[col].to_numpy(), equal_nan=True):
+            df[col] = narrow
+    for col in df.select_dtypes('integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+@st.cache_data(ttl=60)
+def get_data(signature):
+    """
+    Load the report DataFrames for `signature` (see reports_signature), reusing
+    the Parquet copies in CACHE_DIR when they were written for the same one.
+    """
+    signature_path = os.path.join(CACHE_DIR, 'signature')
+    parquet_paths = {key: os.path.join(CACHE_DIR, f'{key}.parquet') for key in DATA_KEYS}
+
+    if os.path.exists(signature_path) and all(os.path.exists(p) for p in parquet_paths.values()):
+        with open(signature_path) as f:
+            cached = f.read() == signature
+        if cached:
+            try:
+                return {key: pd.read_parquet(path) for key, path in parquet_paths.items()}
+            except (OSError, ValueError) as e:
+                # Truncated or otherwise unreadable copy: rebuild it from the reports
+                print(f"Could not read Parquet cache, re-parsing: {e}")
+
+    data = {key: downcast_numeric(df) for key, df in load_all_reports(FOLDER).items()}
+    if not data['sales'].empty:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            for key, path in parquet_paths.items():
+                data[key].to_parquet(path, compression='zstd')
+            with open(signature_path, 'w') as f:
+                f.write(signature)
+        except OSError as e:
+            print(f"Could not write Parquet cache: {e}")
+    return data
+
+
+@st.cache_data(ttl=60)
+def get_store_short(data_version):
+    """Map full store names to short names ('9501 - Normal' → 'Normal')."""
+    frames = [df for key, df in get_data(data_version).items() if key != 'brand_totals' and not df.empty]
+    names = pd.Series(pd.concat([df['store'] for df in frames]).unique())
+    return dict(zip(names, names.str.split(' - ', n=1).str[-1]))
+
+
+@st.cache_data(ttl=60)
+def get_filter_options(data_version):
+    """Sorted report dates and store names for the sidebar filters."""
+    sales = get_data(data_version)['sales']
+    return sorted(sales['date'].unique()), sorted(sales['store'].unique())
 
 
 @st.cache_data(ttl=60)
-def get_data():
-    return load_all_reports(FOLDER)
+def get_heatmap_pivot(data_version):
+    """Day sales % vs LY as a store × date matrix, with MM/DD column labels."""
+    pivot = get_data(data_version)['sales'].pivot_table(
+        index='store', columns='date', values='day_sales_pct', aggfunc='first', observed=True
+    )
+    pivot.columns = [pd.Timestamp(c).strftime('%m/%d') for c in pivot.columns]
+    return pivot
 
 
-data = get_data()
+# Passed to every cached helper below, so they all expire together when a report changes
+data_version = reports_signature()
+data = get_data(data_version)
 sales_df = data['sales']
 brand_df = data['brand_totals']
 trans_df = data['transactions']
@@ -84,6 +200,9 @@ if sales_df.empty:
     st.error("No flash report data found. Place Excel files in the same folder as this dashboard.")
     st.stop()
 
+STORE_SHORT = get_store_short(data_version)
+available_dates, all_stores = get_filter_options(data_version)
+
 # ───────────────────────── Sidebar ─────────────────────────
 with st.sidebar:
     st.image("https://img.icons8.com/fluency/96/noodles.png", width=60)
@@ -92,7 +211,6 @@ with st.sidebar:
     st.divider()
 
     # Date selector
-    available_dates = sorted(sales_df['date'].unique())
     selected_date = st.selectbox(
         "📅 Select Date",
         options=available_dates,
@@ -101,7 +219,6 @@ with st.sidebar:
     )
 
     # Store filter
-    all_stores = sorted(sales_df['store'].unique())
     selected_stores = st.multiselect(
         "🏪 Filter Stores",
         options=all_stores,
@@ -133,22 +250,38 @@ with st.sidebar:
 
 
 # ───────────────────────── Filter Data ─────────────────────────
-def filter_df(df):
-    """Filter dataframe to selected date and stores."""
-    mask = (df['date'] == selected_date) & (df['store'].isin(selected_stores))
-    return df[mask].copy()
-
+# Cached per (data version, dataframe, date, stores) so page switches reuse the same slices.
+# st.cache_data hands back a fresh copy on every hit, so callers may mutate.
+@st.cache_data(ttl=60)
+def filter_df(data_version, df_name, date, stores):
+    """Filter a loaded dataframe to one date and the given stores."""
+    df = get_data(data_version)[df_name]
+    return df[(df['date'] == date) & (df['store'].isin(stores))]
 
-def filter_stores(df):
-    """Filter dataframe to selected stores only (all dates)."""
-    return df[df['store'].isin(selected_stores)].copy()
 
+@st.cache_data(ttl=60)
+def filter_stores(data_version, df_name, stores):
+    """Filter a loaded dataframe to the given stores only (all dates)."""
+    df = get_data(data_version)[df_name]
+    return df[df['store'].isin(stores)]
+
+
+# Per-day frames each page reads; the rest are never filtered
+PAGE_NEEDS = {
+    "Overview": ('sales', 'transactions', 'channels', 'labor'),
+    "Store Comparison": ('sales',),
+    "Trends": ('sales',),
+    "Channel Mix": ('channels',),
+    "Labor & 3rd Party": ('sales', 'labor'),
+}
 
-day_sales = filter_df(sales_df)
-day_trans = filter_df(trans_df)
-day_channel = filter_df(channel_df)
-day_labor = filter_df(labor_df)
-day_brand = brand_df[brand_df['date'] == selected_date]
+store_key = tuple(sorted(selected_stores))
+day_frames = {name: filter_df(data_version, name, selected_date, store_key) for name in PAGE_NEEDS[page]}
+day_sales = day_frames.get('sales')
+day_trans = day_frames.get('transactions')
+day_channel = day_frames.get('channels')
+day_labor = day_frames.get('labor')
+day_brand = brand_df[brand_df['date'] == selected_date] if page == "Overview" else None
 
 
 # ───────────────────────── Helper: KPI Card ─────────────────────────
@@ -160,94 +293,125 @@ def kpi_card(label, value, delta=None, delta_pct=None, prefix="$", suffix=""):
         pct_str = f" ({delta_pct:+.1f}%)" if delta_pct is not None else ""
         delta_html = f'<div class="{css_class}">{arrow} {prefix}{abs(delta):,.0f}{pct_str}</div>'
 
-    st.markdown(f"""
-    <div class="kpi-card">
-        <div class="kpi-label">{label}</div>
-        <div class="kpi-value">{prefix}{value:,.0f}{suffix}</div>
-        {delta_html}
-        <div class="kpi-label" style="margin-top:4px;">vs Last Year</div>
-    </div>
-    """, unsafe_allow_html=True)
+    return (
+        f'<div class="kpi-card">'
+        f'<div class="kpi-label">{label}</div>'
+        f'<div class="kpi-value">{prefix}{value:,.0f}{suffix}</div>'
+        f'{delta_html}'
+        f'<div class="kpi-label" style="margin-top:4px;">vs Last Year</div>'
+        f'</div>'
+    )
+
+
+def kpi_row(cards):
+    """Render a row of kpi_card() HTML snippets as a single markdown element."""
+    st.markdown(f'<div class="kpi-row">{"".join(cards)}</div>', unsafe_allow_html=True)
 
 
 def short_store(name):
     """Shorten store name: '9501 - Normal' → 'Normal'"""
-    parts = str(name).split(' - ')
-    return parts[1] if len(parts) > 1 else name
+    return STORE_SHORT.get(name, name)
+
+
+def store_line_figure(df, y):
+    """
+    One line per store of `y` over date. Stores with more than RESAMPLE_POINTS
+    points are downsampled by plotly-resampler before reaching the browser.
+    """
+    groups = list(df.sort_values('date').groupby('short_store', sort=False, observed=True))
+    resample = max((len(grp) for _, grp in groups), default=0) > RESAMPLE_POINTS
+    if resample:
+        # Imported only when needed: it pulls in Dash and is slow to load
+        from plotly_resampler import FigureResampler
+        # Keep the store names as-is in the legend and hover: no "[R]" prefix
+        # or "~1D" aggregation-size suffix
+        fig = FigureResampler(
+            go.Figure(), default_n_shown_samples=RESAMPLE_POINTS,
+            resampled_trace_prefix_suffix=('', ''), show_mean_aggregation_size=False,
+        )
+    else:
+        fig = go.Figure()
+
+    for i, (store, grp) in enumerate(groups):
+        trace = go.Scattergl(
+            name=store, mode='lines+markers',
+            line=dict(color=STORE_COLORS[i % len(STORE_COLORS)]),
+        )
+        dates = pd.to_datetime(grp['date'])
+        if resample:
+            fig.add_trace(trace, hf_x=dates, hf_y=grp[y])
+        else:
+            fig.add_trace(trace.update(x=dates, y=grp[y]))
+    return fig
 
 
 # ═══════════════════════════════════════════════════════════════
 #  PAGE 1: OVERVIEW
 # ═══════════════════════════════════════════════════════════════
-if page == "Overview":
+def overview_page(day_sales, day_trans, day_channel, day_labor, day_brand):
     st.markdown(f"## 📊 Daily Overview — {pd.Timestamp(selected_date).strftime('%A, %B %d, %Y')}")
 
     # KPI Cards
     if not day_brand.empty:
         row = day_brand.iloc[0]
-        cols = st.columns(4)
-        with cols[0]:
-            kpi_card("Day Sales", row['day_sales_ty'], row['day_sales_diff'], row['day_sales_pct'])
-        with cols[1]:
-            kpi_card("WTD Sales", row['wtd_sales_ty'], row['wtd_sales_diff'], row['wtd_sales_pct'])
-        with cols[2]:
-            kpi_card("PTD Sales", row['ptd_sales_ty'], row['ptd_sales_diff'], row['ptd_sales_pct'])
-        with cols[3]:
-            kpi_card("YTD Sales", row['ytd_sales_ty'], row['ytd_sales_diff'], row['ytd_sales_pct'])
+        kpi_row([
+            kpi_card("Day Sales", row['day_sales_ty'], row['day_sales_diff'], row['day_sales_pct']),
+            kpi_card("WTD Sales", row['wtd_sales_ty'], row['wtd_sales_diff'], row['wtd_sales_pct']),
+            kpi_card("PTD Sales", row['ptd_sales_ty'], row['ptd_sales_diff'], row['ptd_sales_pct']),
+            kpi_card("YTD Sales", row['ytd_sales_ty'], row['ytd_sales_diff'], row['ytd_sales_pct']),
+        ])
 
     st.markdown("")
 
     # Transaction & Avg Check KPIs
     if not day_trans.empty and not day_channel.empty:
-        total_trans_ty = day_trans['day_trans_ty'].sum()
-        total_trans_ly = day_trans['day_trans_ly'].sum()
+        sales_totals = day_sales[['day_sales_ty', 'day_sales_ly']].sum()
+        trans_totals = day_trans[['day_trans_ty', 'day_trans_ly']].sum()
+        total_trans_ty = trans_totals['day_trans_ty']
+        total_trans_ly = trans_totals['day_trans_ly']
         trans_diff = total_trans_ty - total_trans_ly
         trans_pct = (trans_diff / total_trans_ly * 100) if total_trans_ly else 0
 
-        avg_check_ty = day_sales['day_sales_ty'].sum() / total_trans_ty if total_trans_ty else 0
-        avg_check_ly = day_sales['day_sales_ly'].sum() / total_trans_ly if total_trans_ly else 0
+        avg_check_ty = sales_totals['day_sales_ty'] / total_trans_ty if total_trans_ty else 0
+        avg_check_ly = sales_totals['day_sales_ly'] / total_trans_ly if total_trans_ly else 0
         avg_check_diff = avg_check_ty - avg_check_ly
         avg_check_pct = (avg_check_diff / avg_check_ly * 100) if avg_check_ly else 0
 
-        cols2 = st.columns(4)
-        with cols2[0]:
-            kpi_card("Day Transactions", total_trans_ty, trans_diff, trans_pct, prefix="")
-        with cols2[1]:
-            kpi_card("Avg Check", avg_check_ty, avg_check_diff, avg_check_pct)
-        with cols2[2]:
-            ytd_ty = day_brand.iloc[0]['ytd_sales_ty'] if not day_brand.empty else 0
+        total_labor_pct = day_labor['labor_pct'].mean() if not day_labor.empty else 0
+        kpi_row([
+            kpi_card("Day Transactions", total_trans_ty, trans_diff, trans_pct, prefix=""),
+            kpi_card("Avg Check", avg_check_ty, avg_check_diff, avg_check_pct),
             kpi_card("R13 Sales", day_brand.iloc[0]['r13_sales_ty'] if not day_brand.empty else 0,
                      day_brand.iloc[0]['r13_sales_diff'] if not day_brand.empty else 0,
-                     day_brand.iloc[0]['r13_sales_pct'] if not day_brand.empty else 0)
-        with cols2[3]:
-            total_labor_pct = day_labor['labor_pct'].mean() if not day_labor.empty else 0
-            st.markdown(f"""
-            <div class="kpi-card">
-                <div class="kpi-label">Avg Labor %</div>
-                <div class="kpi-value">{total_labor_pct:.1f}%</div>
-                <div class="kpi-label" style="margin-top:4px;">across all stores</div>
-            </div>
-            """, unsafe_allow_html=True)
+                     day_brand.iloc[0]['r13_sales_pct'] if not day_brand.empty else 0),
+            f'<div class="kpi-card">'
+            f'<div class="kpi-label">Avg Labor %</div>'
+            f'<div class="kpi-value">{total_labor_pct:.1f}%</div>'
+            f'<div class="kpi-label" style="margin-top:4px;">across all stores</div>'
+            f'</div>',
+        ])
 
     # ── Daily Sales Trend ──
     st.markdown('<div class="section-header">📈 Daily Sales Trend (All Dates)</div>', unsafe_allow_html=True)
-    trend_df = brand_df.sort_values('date').copy()
+    trend_df = brand_df.sort_values('date')
+    trend_dates = pd.to_datetime(trend_df['date'])
+    # One point per day, so no resampling is needed
     fig_trend = go.Figure()
-    fig_trend.add_trace(go.Scatter(
-        x=trend_df['date'], y=trend_df['day_sales_ty'],
+    fig_trend.add_trace(go.Scattergl(
+        x=trend_dates, y=trend_df['day_sales_ty'],
         mode='lines+markers', name='This Year',
         line=dict(color=COLORS['ty'], width=3),
         marker=dict(size=10),
     ))
-    fig_trend.add_trace(go.Scatter(
-        x=trend_df['date'], y=trend_df['day_sales_ly'],
+    fig_trend.add_trace(go.Scattergl(
+        x=trend_dates, y=trend_df['day_sales_ly'],
         mode='lines+markers', name='Last Year',
         line=dict(color=COLORS['ly'], width=2, dash='dot'),
         marker=dict(size=8),
     ))
     fig_trend.update_layout(
         height=350,
-        margin=dict(l=20, r=20, t=30, b=20),
+        margin={**CHART_MARGIN, 't': 30},
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
         yaxis_title="Total Brand Sales ($)",
         xaxis_title="",
@@ -258,44 +422,50 @@ if page == "Overview":
     # ── Store Performance Table ──
     st.markdown('<div class="section-header">🏪 Store Performance</div>', unsafe_allow_html=True)
     if not day_sales.empty:
-        table_df = day_sales[['store', 'day_sales_ty', 'day_sales_ly', 'day_sales_diff', 'day_sales_pct']].copy()
-        table_df.columns = ['Store', 'Day Sales TY', 'Day Sales LY', '+/-', '% Change']
+        table_df = day_sales[['store', 'day_sales_ty', 'day_sales_ly', 'day_sales_diff', 'day_sales_pct']].set_axis(
+            ['Store', 'Day Sales TY', 'Day Sales LY', '+/-', '% Change'], axis=1
+        )
         table_df = table_df.sort_values('Day Sales TY', ascending=False)
-        table_df['% Change'] = table_df['% Change'].map(lambda x: f"{x:+.1f}%")
-        table_df['Day Sales TY'] = table_df['Day Sales TY'].map(lambda x: f"${x:,.2f}")
-        table_df['Day Sales LY'] = table_df['Day Sales LY'].map(lambda x: f"${x:,.2f}")
-        table_df['+/-'] = table_df['+/-'].map(lambda x: f"${x:+,.2f}")
-        st.dataframe(table_df, use_container_width=True, hide_index=True)
+        st.dataframe(
+            table_df, use_container_width=True, hide_index=True,
+            column_config={
+                'Day Sales TY': st.column_config.NumberColumn(format='dollar'),
+                'Day Sales LY': st.column_config.NumberColumn(format='dollar'),
+                '+/-': st.column_config.NumberColumn(format='dollar'),
+                '% Change': st.column_config.NumberColumn(format='%+.1f%%'),
+            },
+        )
+
 
 # ═══════════════════════════════════════════════════════════════
 #  PAGE 2: STORE COMPARISON
 # ═══════════════════════════════════════════════════════════════
-elif page == "Store Comparison":
+def store_comparison_page(day_sales):
+    import plotly.express as px
     st.markdown(f"## 🏪 Store Comparison — {pd.Timestamp(selected_date).strftime('%b %d, %Y')}")
 
     # TY vs LY bar chart
     st.markdown('<div class="section-header">Day Sales: This Year vs Last Year</div>', unsafe_allow_html=True)
     if not day_sales.empty:
-        chart_df = day_sales.copy()
-        chart_df['short_store'] = chart_df['store'].apply(short_store)
+        chart_df = day_sales.assign(short_store=day_sales['store'].map(STORE_SHORT))
         chart_df = chart_df.sort_values('day_sales_ty', ascending=True)
 
         fig_comp = go.Figure()
         fig_comp.add_trace(go.Bar(
             y=chart_df['short_store'], x=chart_df['day_sales_ly'],
             name='Last Year', orientation='h',
-            marker_color=COLORS['ly'], text=chart_df['day_sales_ly'].map(lambda x: f"${x:,.0f}"),
+            marker_color=COLORS['ly'], texttemplate='$%{x:,.0f}',
             textposition='auto',
         ))
         fig_comp.add_trace(go.Bar(
             y=chart_df['short_store'], x=chart_df['day_sales_ty'],
             name='This Year', orientation='h',
-            marker_color=COLORS['ty'], text=chart_df['day_sales_ty'].map(lambda x: f"${x:,.0f}"),
+            marker_color=COLORS['ty'], texttemplate='$%{x:,.0f}',
             textposition='auto',
         ))
         fig_comp.update_layout(
             barmode='group', height=400,
-            margin=dict(l=20, r=20, t=10, b=20),
+            margin=CHART_MARGIN,
             legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
             xaxis_title="Sales ($)",
         )
@@ -303,13 +473,10 @@ elif page == "Store Comparison":
 
     # ── Heatmap: % change by store across dates ──
     st.markdown('<div class="section-header">📊 Performance Heatmap (% Change vs LY)</div>', unsafe_allow_html=True)
-    stores_sales = filter_stores(sales_df)
-    if not stores_sales.empty:
-        pivot = stores_sales.pivot_table(
-            index='store', columns='date', values='day_sales_pct', aggfunc='first'
-        )
-        pivot.index = pivot.index.map(short_store)
-        pivot.columns = [pd.Timestamp(c).strftime('%m/%d') for c in pivot.columns]
+    pivot = get_heatmap_pivot(data_version)
+    pivot = pivot[pivot.index.isin(selected_stores)].dropna(axis=1, how='all')
+    if not pivot.empty:
+        pivot.index = pivot.index.map(STORE_SHORT)
 
         fig_heat = px.imshow(
             pivot.values,
@@ -322,7 +489,7 @@ elif page == "Store Comparison":
         )
         fig_heat.update_layout(
             height=350,
-            margin=dict(l=20, r=20, t=10, b=20),
+            margin=CHART_MARGIN,
             coloraxis_colorbar_title="% vs LY",
         )
         st.plotly_chart(fig_heat, use_container_width=True)
@@ -334,43 +501,37 @@ elif page == "Store Comparison":
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("#### 🥇 Best Performers")
-            for _, row in sorted_stores.head(3).iterrows():
-                delta_class = "kpi-delta-pos" if row['day_sales_pct'] >= 0 else "kpi-delta-neg"
+            for row in sorted_stores.head(3).itertuples(index=False):
+                delta_class = "kpi-delta-pos" if row.day_sales_pct >= 0 else "kpi-delta-neg"
                 st.markdown(f"""
-                **{short_store(row['store'])}** — <span class="{delta_class}">{row['day_sales_pct']:+.1f}%</span>
-                (${row['day_sales_ty']:,.0f})
+                **{short_store(row.store)}** — <span class="{delta_class}">{row.day_sales_pct:+.1f}%</span>
+                (${row.day_sales_ty:,.0f})
                 """, unsafe_allow_html=True)
         with col2:
             st.markdown("#### 📉 Needs Attention")
-            for _, row in sorted_stores.tail(3).iterrows():
-                delta_class = "kpi-delta-pos" if row['day_sales_pct'] >= 0 else "kpi-delta-neg"
+            for row in sorted_stores.tail(3).itertuples(index=False):
+                delta_class = "kpi-delta-pos" if row.day_sales_pct >= 0 else "kpi-delta-neg"
                 st.markdown(f"""
-                **{short_store(row['store'])}** — <span class="{delta_class}">{row['day_sales_pct']:+.1f}%</span>
-                (${row['day_sales_ty']:,.0f})
+                **{short_store(row.store)}** — <span class="{delta_class}">{row.day_sales_pct:+.1f}%</span>
+                (${row.day_sales_ty:,.0f})
                 """, unsafe_allow_html=True)
 
 
 # ═══════════════════════════════════════════════════════════════
 #  PAGE 3: TRENDS
 # ═══════════════════════════════════════════════════════════════
-elif page == "Trends":
+def trends_page(day_sales):
     st.markdown("## 📈 Sales & Transaction Trends")
 
     # ── Daily sales per store ──
     st.markdown('<div class="section-header">Daily Sales by Store Over Time</div>', unsafe_allow_html=True)
-    stores_sales = filter_stores(sales_df)
+    stores_sales = filter_stores(data_version, 'sales', store_key)
     if not stores_sales.empty:
-        stores_sales = stores_sales.copy()
-        stores_sales['short_store'] = stores_sales['store'].apply(short_store)
-        fig_lines = px.line(
-            stores_sales.sort_values('date'),
-            x='date', y='day_sales_ty', color='short_store',
-            markers=True,
-            color_discrete_sequence=STORE_COLORS,
-        )
+        stores_sales = stores_sales.assign(short_store=stores_sales['store'].map(STORE_SHORT))
+        fig_lines = store_line_figure(stores_sales, 'day_sales_ty')
         fig_lines.update_layout(
             height=400,
-            margin=dict(l=20, r=20, t=10, b=20),
+            margin=CHART_MARGIN,
             legend_title="Store",
             yaxis_title="Day Sales ($)",
             xaxis_title="",
@@ -381,14 +542,24 @@ elif page == "Trends":
     # ── Sales Period Comparison ──
     st.markdown('<div class="section-header">Sales Period Comparison (Selected Date)</div>', unsafe_allow_html=True)
     if not day_sales.empty:
-        period_data = []
-        for _, row in day_sales.iterrows():
-            store_short = short_store(row['store'])
-            period_data.append({'Store': store_short, 'Period': 'Day', 'TY': row['day_sales_ty'], 'LY': row['day_sales_ly']})
-            period_data.append({'Store': store_short, 'Period': 'WTD', 'TY': row['wtd_sales_ty'], 'LY': row['wtd_sales_ly']})
-            period_data.append({'Store': store_short, 'Period': 'PTD', 'TY': row['ptd_sales_ty'], 'LY': row['ptd_sales_ly']})
-
-        period_df = pd.DataFrame(period_data)
+        period_long = day_sales.melt(
+            id_vars=['store'],
+            value_vars=[f'{p}_sales_{y}' for p in PERIOD_LABELS for y in ('ty', 'ly')],
+            var_name='column', value_name='Sales',
+        )
+        period_long = period_long.join(
+            period_long['column'].str.extract(r'^(?P<Period>\w+)_sales_(?P<Year>ty|ly)$')
+        )
+        period_df = (
+            period_long.pivot(index=['store', 'Period'], columns='Year', values='Sales')
+            .rename(columns={'ty': 'TY', 'ly': 'LY'})
+            .rename_axis(columns=None)
+            .reset_index()
+        )
+        period_df = period_df.assign(
+            Store=period_df['store'].map(STORE_SHORT),
+            Period=period_df['Period'].map(PERIOD_LABELS),
+        )
 
         tab1, tab2, tab3 = st.tabs(["Day", "WTD", "PTD"])
         for tab, period in zip([tab1, tab2, tab3], ["Day", "WTD", "PTD"]):
@@ -397,24 +568,20 @@ elif page == "Trends":
                 fig_p = go.Figure()
                 fig_p.add_trace(go.Bar(y=pdata['Store'], x=pdata['LY'], name='LY', orientation='h', marker_color=COLORS['ly']))
                 fig_p.add_trace(go.Bar(y=pdata['Store'], x=pdata['TY'], name='TY', orientation='h', marker_color=COLORS['ty']))
-                fig_p.update_layout(barmode='group', height=350, margin=dict(l=20, r=20, t=10, b=20), xaxis_title="Sales ($)")
-                st.plotly_chart(fig_p, use_container_width=True)
+                fig_p.update_layout(barmode='group', height=350, margin=CHART_MARGIN, xaxis_title="Sales ($)")
+                # Periods can hold identical figures (e.g. on the first day of a period),
+                # which would collide on the auto-generated element ID without a key
+                st.plotly_chart(fig_p, use_container_width=True, key=f"period_{period}")
 
     # ── Transaction Trends ──
     st.markdown('<div class="section-header">Daily Transactions by Store Over Time</div>', unsafe_allow_html=True)
-    stores_trans = filter_stores(trans_df)
+    stores_trans = filter_stores(data_version, 'transactions', store_key)
     if not stores_trans.empty:
-        stores_trans = stores_trans.copy()
-        stores_trans['short_store'] = stores_trans['store'].apply(short_store)
-        fig_trans = px.line(
-            stores_trans.sort_values('date'),
-            x='date', y='day_trans_ty', color='short_store',
-            markers=True,
-            color_discrete_sequence=STORE_COLORS,
-        )
+        stores_trans = stores_trans.assign(short_store=stores_trans['store'].map(STORE_SHORT))
+        fig_trans = store_line_figure(stores_trans, 'day_trans_ty')
         fig_trans.update_layout(
             height=400,
-            margin=dict(l=20, r=20, t=10, b=20),
+            margin=CHART_MARGIN,
             legend_title="Store",
             yaxis_title="Transactions",
             xaxis_title="",
@@ -426,7 +593,8 @@ elif page == "Trends":
 # ═══════════════════════════════════════════════════════════════
 #  PAGE 4: CHANNEL MIX
 # ═══════════════════════════════════════════════════════════════
-elif page == "Channel Mix":
+def channel_mix_page(day_channel):
+    import plotly.express as px
     st.markdown(f"## 🍽️ Channel Mix — {pd.Timestamp(selected_date).strftime('%b %d, %Y')}")
 
     if not day_channel.empty:
@@ -451,7 +619,7 @@ elif page == "Channel Mix":
                 color_discrete_sequence=['#3498db', '#2ecc71', '#e74c3c', '#f39c12'],
             )
             fig_donut.update_traces(textinfo='label+percent+value', texttemplate='%{label}<br>%{percent}<br>$%{value:,.0f}')
-            fig_donut.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=20), showlegend=False)
+            fig_donut.update_layout(height=400, margin={**CHART_MARGIN, 't': 30}, showlegend=False)
             st.plotly_chart(fig_donut, use_container_width=True)
 
         with col2:
@@ -468,73 +636,71 @@ elif page == "Channel Mix":
 
         # ── Channel Mix by Store ──
         st.markdown('<div class="section-header">Channel Mix by Store</div>', unsafe_allow_html=True)
-        mix_data = []
-        for _, row in day_channel.iterrows():
-            store_short = short_store(row['store'])
-            mix_data.append({'Store': store_short, 'Channel': 'Dine In', 'Sales': row['dine_in_sales']})
-            mix_data.append({'Store': store_short, 'Channel': 'Carry Out', 'Sales': row['carry_out_sales']})
-            mix_data.append({'Store': store_short, 'Channel': 'Delivery', 'Sales': row['delivery_sales']})
-            if row['drive_thru_sales'] > 0:
-                mix_data.append({'Store': store_short, 'Channel': 'Drive Thru', 'Sales': row['drive_thru_sales']})
-
-        mix_df = pd.DataFrame(mix_data)
+        mix_df = day_channel.melt(
+            id_vars=['store'],
+            value_vars=[f'{ch}_sales' for ch in CHANNEL_LABELS],
+            var_name='Channel', value_name='Sales',
+        )
+        mix_df = mix_df[mix_df['Sales'] > 0].assign(
+            Store=lambda df: df['store'].map(STORE_SHORT),
+            Channel=lambda df: df['Channel'].str.removesuffix('_sales').map(CHANNEL_LABELS),
+        )
         fig_stack = px.bar(
             mix_df, x='Store', y='Sales', color='Channel',
             color_discrete_map={'Dine In': '#3498db', 'Carry Out': '#2ecc71', 'Delivery': '#e74c3c', 'Drive Thru': '#f39c12'},
         )
         fig_stack.update_layout(
             barmode='stack', height=400,
-            margin=dict(l=20, r=20, t=10, b=20),
+            margin=CHART_MARGIN,
             yaxis_title="Sales ($)",
         )
         st.plotly_chart(fig_stack, use_container_width=True)
 
         # ── Average Check by Channel ──
         st.markdown('<div class="section-header">Average Check by Channel & Store</div>', unsafe_allow_html=True)
-        avg_data = []
-        for _, row in day_channel.iterrows():
-            store_short = short_store(row['store'])
-            avg_data.append({'Store': store_short, 'Channel': 'Dine In', 'Avg Check': row['dine_in_avg_check']})
-            avg_data.append({'Store': store_short, 'Channel': 'Carry Out', 'Avg Check': row['carry_out_avg_check']})
-            avg_data.append({'Store': store_short, 'Channel': 'Delivery', 'Avg Check': row['delivery_avg_check']})
-            if row['drive_thru_avg_check'] > 0:
-                avg_data.append({'Store': store_short, 'Channel': 'Drive Thru', 'Avg Check': row['drive_thru_avg_check']})
-
-        avg_df = pd.DataFrame(avg_data)
+        avg_df = day_channel.melt(
+            id_vars=['store'],
+            value_vars=[f'{ch}_avg_check' for ch in CHANNEL_LABELS],
+            var_name='Channel', value_name='Avg Check',
+        )
+        avg_df = avg_df[avg_df['Avg Check'] > 0].assign(
+            Store=lambda df: df['store'].map(STORE_SHORT),
+            Channel=lambda df: df['Channel'].str.removesuffix('_avg_check').map(CHANNEL_LABELS),
+        )
         fig_avg = px.bar(
             avg_df, x='Store', y='Avg Check', color='Channel', barmode='group',
             color_discrete_map={'Dine In': '#3498db', 'Carry Out': '#2ecc71', 'Delivery': '#e74c3c', 'Drive Thru': '#f39c12'},
         )
-        fig_avg.update_layout(height=400, margin=dict(l=20, r=20, t=10, b=20), yaxis_title="Avg Check ($)")
+        fig_avg.update_layout(height=400, margin=CHART_MARGIN, yaxis_title="Avg Check ($)")
         st.plotly_chart(fig_avg, use_container_width=True)
 
 
 # ═══════════════════════════════════════════════════════════════
 #  PAGE 5: LABOR & 3RD PARTY
 # ═══════════════════════════════════════════════════════════════
-elif page == "Labor & 3rd Party":
+def labor_page(day_labor, day_sales):
+    import plotly.express as px
     st.markdown(f"## 💰 Labor & 3rd Party Delivery — {pd.Timestamp(selected_date).strftime('%b %d, %Y')}")
 
     if not day_labor.empty:
         # ── Labor % by Store ──
         st.markdown('<div class="section-header">Labor % by Store</div>', unsafe_allow_html=True)
-        labor_chart = day_labor.copy()
-        labor_chart['short_store'] = labor_chart['store'].apply(short_store)
+        labor_chart = day_labor.assign(short_store=day_labor['store'].map(STORE_SHORT))
         labor_chart = labor_chart.sort_values('labor_pct', ascending=True)
 
         fig_labor = go.Figure()
         fig_labor.add_trace(go.Bar(
             y=labor_chart['short_store'], x=labor_chart['labor_pct'],
             orientation='h',
-            marker_color=[COLORS['negative'] if x > 20 else COLORS['ty'] for x in labor_chart['labor_pct']],
-            text=labor_chart['labor_pct'].map(lambda x: f"{x:.1f}%"),
+            marker_color=np.where(labor_chart['labor_pct'].to_numpy() > 20, COLORS['negative'], COLORS['ty']),
+            texttemplate='%{x:.1f}%',
             textposition='auto',
         ))
         # Target line at 18%
         fig_labor.add_vline(x=18, line_dash="dash", line_color="red", annotation_text="Target 18%")
         fig_labor.update_layout(
             height=350,
-            margin=dict(l=20, r=20, t=10, b=20),
+            margin=CHART_MARGIN,
             xaxis_title="Labor %",
         )
         st.plotly_chart(fig_labor, use_container_width=True)
@@ -543,11 +709,16 @@ elif page == "Labor & 3rd Party":
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("**Labor Summary**")
-            labor_summary = labor_chart[['short_store', 'labor_dollars', 'labor_pct']].copy()
-            labor_summary.columns = ['Store', 'Labor $', 'Labor %']
-            labor_summary['Labor $'] = labor_summary['Labor $'].map(lambda x: f"${x:,.2f}")
-            labor_summary['Labor %'] = labor_summary['Labor %'].map(lambda x: f"{x:.1f}%")
-            st.dataframe(labor_summary, use_container_width=True, hide_index=True)
+            labor_summary = labor_chart[['short_store', 'labor_dollars', 'labor_pct']].set_axis(
+                ['Store', 'Labor $', 'Labor %'], axis=1
+            )
+            st.dataframe(
+                labor_summary, use_container_width=True, hide_index=True,
+                column_config={
+                    'Labor $': st.column_config.NumberColumn(format='dollar'),
+                    'Labor %': st.column_config.NumberColumn(format='%.1f%%'),
+                },
+            )
 
         with col2:
             total_labor = day_labor['labor_dollars'].sum()
@@ -564,22 +735,17 @@ elif page == "Labor & 3rd Party":
         # ── 3rd Party Delivery Breakdown ──
         st.markdown('<div class="section-header">🚗 3rd Party Delivery Breakdown</div>', unsafe_allow_html=True)
 
-        third_party_data = []
-        for _, row in day_labor.iterrows():
-            store_short = short_store(row['store'])
-            if row['doordash'] > 0:
-                third_party_data.append({'Store': store_short, 'Platform': 'DoorDash', 'Sales': row['doordash']})
-            if row['ubereats'] > 0:
-                third_party_data.append({'Store': store_short, 'Platform': 'UberEats', 'Sales': row['ubereats']})
-            if row['grubhub'] > 0:
-                third_party_data.append({'Store': store_short, 'Platform': 'GrubHub', 'Sales': row['grubhub']})
-            if row['eatstreet'] > 0:
-                third_party_data.append({'Store': store_short, 'Platform': 'EatStreet', 'Sales': row['eatstreet']})
-            if row['ezcater'] > 0:
-                third_party_data.append({'Store': store_short, 'Platform': 'EZ Cater', 'Sales': row['ezcater']})
-
-        if third_party_data:
-            tp_df = pd.DataFrame(third_party_data)
+        tp_df = day_labor.melt(
+            id_vars=['store'],
+            value_vars=list(PLATFORM_LABELS),
+            var_name='Platform', value_name='Sales',
+        )
+        tp_df = tp_df[tp_df['Sales'] > 0].assign(
+            Store=lambda df: df['store'].map(STORE_SHORT),
+            Platform=lambda df: df['Platform'].map(PLATFORM_LABELS),
+        )
+
+        if not tp_df.empty:
             fig_tp = px.bar(
                 tp_df, x='Store', y='Sales', color='Platform',
                 color_discrete_map={
@@ -589,15 +755,16 @@ elif page == "Labor & 3rd Party":
             )
             fig_tp.update_layout(
                 barmode='stack', height=400,
-                margin=dict(l=20, r=20, t=10, b=20),
+                margin=CHART_MARGIN,
                 yaxis_title="Sales ($)",
             )
             st.plotly_chart(fig_tp, use_container_width=True)
 
         # ── 3rd Party % of Sales ──
         st.markdown('<div class="section-header">3rd Party as % of Daily Sales</div>', unsafe_allow_html=True)
-        tp_pct = day_labor[['store', 'total_3rd_party_pct']].copy()
-        tp_pct['short_store'] = tp_pct['store'].apply(short_store)
+        tp_pct = day_labor[['store', 'total_3rd_party_pct']].assign(
+            short_store=day_labor['store'].map(STORE_SHORT)
+        )
         tp_pct = tp_pct.sort_values('total_3rd_party_pct', ascending=True)
 
         fig_tp_pct = go.Figure()
@@ -605,27 +772,41 @@ elif page == "Labor & 3rd Party":
             y=tp_pct['short_store'], x=tp_pct['total_3rd_party_pct'],
             orientation='h',
             marker_color='#e74c3c',
-            text=tp_pct['total_3rd_party_pct'].map(lambda x: f"{x:.1f}%"),
+            texttemplate='%{x:.1f}%',
             textposition='auto',
         ))
         fig_tp_pct.update_layout(
             height=350,
-            margin=dict(l=20, r=20, t=10, b=20),
+            margin=CHART_MARGIN,
             xaxis_title="3rd Party Delivery % of Sales",
         )
         st.plotly_chart(fig_tp_pct, use_container_width=True)
 
         # OLO Summary
         st.markdown('<div class="section-header">📱 Online Ordering (OLO) by Store</div>', unsafe_allow_html=True)
-        olo_chart = day_labor.copy()
-        olo_chart['short_store'] = olo_chart['store'].apply(short_store)
+        olo_chart = day_labor.assign(short_store=day_labor['store'].map(STORE_SHORT))
         olo_chart = olo_chart.sort_values('olo_sales', ascending=True)
         fig_olo = go.Figure()
         fig_olo.add_trace(go.Bar(
             y=olo_chart['short_store'], x=olo_chart['olo_sales'],
             orientation='h', marker_color='#9b59b6',
-            text=olo_chart['olo_sales'].map(lambda x: f"${x:,.0f}"),
+            texttemplate='$%{x:,.0f}',
             textposition='auto',
         ))
-        fig_olo.update_layout(height=350, margin=dict(l=20, r=20, t=10, b=20), xaxis_title="OLO Sales ($)")
+        fig_olo.update_layout(height=350, margin=CHART_MARGIN, xaxis_title="OLO Sales ($)")
         st.plotly_chart(fig_olo, use_container_width=True)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  PAGE DISPATCH
+# ═══════════════════════════════════════════════════════════════
+if page == "Overview":
+    overview_page(day_sales, day_trans, day_channel, day_labor, day_brand)
+elif page == "Store Comparison":
+    store_comparison_page(day_sales)
+elif page == "Trends":
+    trends_page(day_sales)
+elif page == "Channel Mix":
+    channel_mix_page(day_channel)
+elif page == "Labor & 3rd Party":
+    labor_page(day_labor, day_sales)
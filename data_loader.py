@@ -5,25 +5,56 @@ Parses all Excel files in the folder and returns structured DataFrames.
 
 import os
 import re
-import glob
+import pickle
+import zipfile
+import numpy as np
 import pandas as pd
+from operator import itemgetter
 from openpyxl import load_workbook
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
+
+try:
+    from lxml import etree
+except ImportError:  # the stdlib parser offers the same fromstring/iterparse API
+    import xml.etree.ElementTree as etree
+
+# 'Selected Date:2/22/2026' → ('2', '22', '2026'); the date can sit anywhere in the cell
+_DATE_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+# 'Multibrand_FlashReport.nopag[74].xlsx' → '[74]'
+_SUFFIX_RE = re.compile(r'(\[\d+\])')
 
 
 def parse_date_from_cell(value):
     """Extract date from cell like 'Selected Date:2/22/2026'."""
     if not value:
         return None
-    match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', str(value))
+    return _parse_date_text(str(value))
+
+
+@lru_cache(maxsize=1024)
+def _parse_date_text(text):
+    """parse_date_from_cell for a cell's text; reports repeat the same few dates."""
+    match = _DATE_RE.search(text)
     if match:
-        return datetime.strptime(match.group(1), '%m/%d/%Y').date()
+        # Plain int split; strptime is locale-aware and far slower
+        month, day, year = match.groups()
+        return date(int(year), int(month), int(day))
     return None
 
 
+# Cell values that mean "no number" in the reports
+_EMPTY = frozenset((None, '', '-'))
+
+
 def safe_float(val, default=0.0):
     """Safely convert value to float."""
-    if val is None or val == '' or val == '-':
+    cls = val.__class__
+    if cls is float:
+        return val
+    if cls is int:
+        return float(val)
+    if val in _EMPTY:
         return default
     try:
         return float(val)
@@ -33,7 +64,12 @@ def safe_float(val, default=0.0):
 
 def safe_int(val, default=0):
     """Safely convert value to int."""
-    if val is None or val == '' or val == '-':
+    cls = val.__class__
+    if cls is int:
+        return val
+    if cls is float and val == val:  # NaN falls through to the default
+        return int(val)
+    if val in _EMPTY:
         return default
     try:
         return int(float(val))
@@ -41,171 +77,376 @@ def safe_int(val, default=0):
         return default
 
 
+# First and last sheet row (1-based, as in Excel) of each report block
+SECTIONS = {
+    'sales': (8, 15),
+    'brand_total': (16, 16),
+    'transactions': (54, 61),
+    'channels': (66, 73),
+    'labor': (78, 85),
+}
+LAST_ROW = max(last for _, last in SECTIONS.values())
+LAST_COLUMN = 21  # column U
+
+
+# Column order of each section: date, store (column A), then columns B onwards.
+# parse_flash_report returns one list per column so DataFrames build column-wise
+SALES_COLS = (
+    'date', 'store',
+    'day_sales_ty', 'day_sales_ly', 'day_sales_diff', 'day_sales_pct',
+    'wtd_sales_ty', 'wtd_sales_ly', 'wtd_sales_diff', 'wtd_sales_pct',
+    'ptd_sales_ty', 'ptd_sales_ly', 'ptd_sales_diff', 'ptd_sales_pct',
+    'ytd_sales_ty', 'ytd_sales_ly', 'ytd_sales_diff', 'ytd_sales_pct',
+    'r13_sales_ty', 'r13_sales_ly', 'r13_sales_diff', 'r13_sales_pct',
+)
+
+TRANSACTIONS_COLS = (
+    'date', 'store',
+    'day_trans_ty', 'day_trans_ly', 'day_trans_diff', 'day_trans_pct',
+    'wtd_trans_ty', 'wtd_trans_ly', 'wtd_trans_diff', 'wtd_trans_pct',
+    'ptd_trans_ty', 'ptd_trans_ly', 'ptd_trans_diff', 'ptd_trans_pct',
+    'ytd_trans_ty', 'ytd_trans_ly', 'ytd_trans_diff', 'ytd_trans_pct',
+    'r13_trans_ty', 'r13_trans_ly', 'r13_trans_diff', 'r13_trans_pct',
+)
+
+CHANNELS_COLS = (
+    'date', 'store',
+    'avg_check_ty', 'avg_check_ly', 'avg_check_diff', 'avg_check_pct',
+    'dine_in_sales', 'dine_in_trans', 'dine_in_avg_check', 'dine_in_pct_sales',
+    'carry_out_sales', 'carry_out_trans', 'carry_out_avg_check', 'carry_out_pct_sales',
+    'delivery_sales', 'delivery_trans', 'delivery_avg_check', 'delivery_pct_sales',
+    'drive_thru_sales', 'drive_thru_trans', 'drive_thru_avg_check', 'drive_thru_pct_sales',
+)
+
+LABOR_COLS = (
+    'date', 'store',
+    'labor_dollars', 'labor_pct', 'olo_sales',
+    'doordash', 'ubereats', 'grubhub', 'eatstreet', 'ezcater',
+    'total_3rd_party_dollars', 'total_3rd_party_pct',
+)
+
+# The brand total row has the sales columns without a store; parse_flash_report
+# returns it as a single tuple in this order
+BRAND_COLS = tuple(col for col in SALES_COLS if col != 'store')
+
+# Converters for columns B-U of the sections that mix counts and ratios
+TRANSACTIONS_CONVERTERS = (safe_int, safe_int, safe_int, safe_float) * 5
+CHANNELS_CONVERTERS = (safe_float,) * 4 + (safe_float, safe_int, safe_float, safe_float) * 4
+
+
+def _rows_to_columns(columns, rows):
+    """Transpose row tuples into a dict of column lists named by `columns`."""
+    if not rows:
+        return {col: [] for col in columns}
+    return dict(zip(columns, map(list, zip(*rows))))
+
+
+# Read the sheet XML straight out of the .xlsx instead of going through
+# openpyxl; set to False to fall back to openpyxl
+USE_FAST_XML = True
+
+SHEET_NAME = 'Multibrand_DailyFlashReport'
+
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+# 'U85' → 'U'
+_COLUMN_RE = re.compile(r'[A-Z]+')
+
+
+def _open_report(filepath):
+    """
+    Open a report read-only and return (workbook, flash report sheet).
+    Only cached values are read, so external links and VBA are skipped.
+    """
+    wb = load_workbook(filepath, read_only=True, data_only=True,
+                       keep_links=False, keep_vba=False)
+    return wb, wb[SHEET_NAME]
+
+
+def _sheet_part(archive):
+    """Path of the flash report sheet's XML inside the .xlsx archive."""
+    workbook = etree.fromstring(archive.read('xl/workbook.xml'))
+    rel_ids = [sheet.get(_NS_REL + 'id') for sheet in workbook.iter(_NS + 'sheet')
+               if sheet.get('name') == SHEET_NAME]
+    if not rel_ids:
+        raise KeyError(f"Worksheet {SHEET_NAME} does not exist.")
+    rels = etree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter(_NS_PKG_REL + 'Relationship'):
+        if rel.get('Id') == rel_ids[0]:
+            target = rel.get('Target')
+            return target[1:] if target.startswith('/') else 'xl/' + target
+    raise KeyError(f"Worksheet {SHEET_NAME} has no part in the archive.")
+
+
+def _rich_text(node):
+    """Text content of an <si>/<is> node, the way openpyxl joins its runs."""
+    plain = node.find(_NS + 't')
+    if plain is not None:
+        return plain.text or ''
+    return ''.join(t.text or '' for t in node.iterfind(f'{_NS}r/{_NS}t'))
+
+
+def _shared_strings(archive):
+    try:
+        table = etree.fromstring(archive.read('xl/sharedStrings.xml'))
+    except KeyError:  # reports exported with inline strings have no table
+        return []
+    return [_rich_text(si) for si in table.iter(_NS + 'si')]
+
+
+def _cell_value(cell, strings):
+    """Cached value of a <c> element, typed like openpyxl's values_only rows."""
+    kind = cell.get('t', 'n')
+    if kind == 'inlineStr':
+        inline = cell.find(_NS + 'is')
+        return None if inline is None else _rich_text(inline)
+    v = cell.find(_NS + 'v')
+    if v is None or v.text is None:
+        return None
+    text = v.text
+    if kind == 'n':
+        return float(text) if '.' in text or 'E' in text or 'e' in text else int(text)
+    if kind == 's':
+        return strings[int(text)]
+    if kind == 'b':
+        return bool(int(text))
+    return text  # 'str' formula results and 'e' error codes
+
+
+def _column_index(letters):
+    """'A' → 1, 'U' → 21, 'AA' → 27."""
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index
+
+
+def _read_grid_xml(filepath, max_row):
+    """_read_grid without openpyxl: stream the sheet XML up to `max_row`."""
+    grid = [[None] * LAST_COLUMN for _ in range(max_row)]
+    with zipfile.ZipFile(filepath) as archive:
+        strings = _shared_strings(archive)
+        with archive.open(_sheet_part(archive)) as sheet:
+            row_number = 0
+            for _, elem in etree.iterparse(sheet, events=('end',)):
+                if elem.tag != _NS + 'row':
+                    continue
+                row_number = int(elem.get('r') or row_number + 1)
+                if row_number > max_row:
+                    break
+                column = 0
+                for cell in elem.iter(_NS + 'c'):
+                    ref = cell.get('r')
+                    column = _column_index(_COLUMN_RE.match(ref).group()) if ref else column + 1
+                    if column <= LAST_COLUMN:
+                        grid[row_number - 1][column - 1] = _cell_value(cell, strings)
+                elem.clear()
+    return [tuple(row) for row in grid]
+
+
+def _read_grid(filepath, max_row=LAST_ROW):
+    """
+    Values of A1:U<max_row> of the report sheet as row tuples, with missing
+    cells as None.
+    """
+    if USE_FAST_XML:
+        return _read_grid_xml(filepath, max_row)
+    wb, ws = _open_report(filepath)
+    # Read-only sheets are slow at random cell access, so stream the range once
+    grid = list(ws.iter_rows(min_row=1, max_row=max_row, max_col=LAST_COLUMN, values_only=True))
+    wb.close()
+    # openpyxl stops early when the sheet ends before max_row; pad like empty cells
+    grid += [(None,) * LAST_COLUMN] * (max_row - len(grid))
+    return grid
+
+
 def parse_flash_report(filepath):
     """
     Parse a single Multibrand Flash Report Excel file.
-    Returns a dict with DataFrames for each data section.
+    Returns a dict with each per-store section as a dict of column lists and
+    the brand total row as a tuple.
     """
-    wb = load_workbook(filepath, data_only=True)
-    ws = wb['Multibrand_DailyFlashReport']
+    grid = _read_grid(filepath)
+
+    def section_rows(name):
+        first, last = SECTIONS[name]
+        return grid[first - 1:last]
 
     # Extract report date from cell A2
-    report_date = parse_date_from_cell(ws['A2'].value)
+    report_date = parse_date_from_cell(grid[1][0])
     if not report_date:
-        wb.close()
         return None
 
     # --- Section 1: Sales by Store (rows 8-15 in first section) ---
-    sales_records = []
-    for row_num in range(8, 16):  # rows 8–15
-        store_name = ws.cell(row=row_num, column=1).value
+    sales_rows = []
+    for row in section_rows('sales'):
+        store_name = row[0]
         if not store_name or 'Totals' in str(store_name) or 'Brand' in str(store_name):
             continue
-        sales_records.append({
-            'date': report_date,
-            'store': str(store_name).strip(),
-            'day_sales_ty': safe_float(ws.cell(row=row_num, column=2).value),
-            'day_sales_ly': safe_float(ws.cell(row=row_num, column=3).value),
-            'day_sales_diff': safe_float(ws.cell(row=row_num, column=4).value),
-            'day_sales_pct': safe_float(ws.cell(row=row_num, column=5).value),
-            'wtd_sales_ty': safe_float(ws.cell(row=row_num, column=6).value),
-            'wtd_sales_ly': safe_float(ws.cell(row=row_num, column=7).value),
-            'wtd_sales_diff': safe_float(ws.cell(row=row_num, column=8).value),
-            'wtd_sales_pct': safe_float(ws.cell(row=row_num, column=9).value),
-            'ptd_sales_ty': safe_float(ws.cell(row=row_num, column=10).value),
-            'ptd_sales_ly': safe_float(ws.cell(row=row_num, column=11).value),
-            'ptd_sales_diff': safe_float(ws.cell(row=row_num, column=12).value),
-            'ptd_sales_pct': safe_float(ws.cell(row=row_num, column=13).value),
-            'ytd_sales_ty': safe_float(ws.cell(row=row_num, column=14).value),
-            'ytd_sales_ly': safe_float(ws.cell(row=row_num, column=15).value),
-            'ytd_sales_diff': safe_float(ws.cell(row=row_num, column=16).value),
-            'ytd_sales_pct': safe_float(ws.cell(row=row_num, column=17).value),
-            'r13_sales_ty': safe_float(ws.cell(row=row_num, column=18).value),
-            'r13_sales_ly': safe_float(ws.cell(row=row_num, column=19).value),
-            'r13_sales_diff': safe_float(ws.cell(row=row_num, column=20).value),
-            'r13_sales_pct': safe_float(ws.cell(row=row_num, column=21).value),
-        })
+        sales_rows.append((report_date, store_name, *map(safe_float, row[1:21])))
+    sales = _rows_to_columns(SALES_COLS, sales_rows)
 
     # Brand totals (row 16)
-    brand_total = {
-        'date': report_date,
-        'day_sales_ty': safe_float(ws.cell(row=16, column=2).value),
-        'day_sales_ly': safe_float(ws.cell(row=16, column=3).value),
-        'day_sales_diff': safe_float(ws.cell(row=16, column=4).value),
-        'day_sales_pct': safe_float(ws.cell(row=16, column=5).value),
-        'wtd_sales_ty': safe_float(ws.cell(row=16, column=6).value),
-        'wtd_sales_ly': safe_float(ws.cell(row=16, column=7).value),
-        'wtd_sales_diff': safe_float(ws.cell(row=16, column=8).value),
-        'wtd_sales_pct': safe_float(ws.cell(row=16, column=9).value),
-        'ptd_sales_ty': safe_float(ws.cell(row=16, column=10).value),
-        'ptd_sales_ly': safe_float(ws.cell(row=16, column=11).value),
-        'ptd_sales_diff': safe_float(ws.cell(row=16, column=12).value),
-        'ptd_sales_pct': safe_float(ws.cell(row=16, column=13).value),
-        'ytd_sales_ty': safe_float(ws.cell(row=16, column=14).value),
-        'ytd_sales_ly': safe_float(ws.cell(row=16, column=15).value),
-        'ytd_sales_diff': safe_float(ws.cell(row=16, column=16).value),
-        'ytd_sales_pct': safe_float(ws.cell(row=16, column=17).value),
-        'r13_sales_ty': safe_float(ws.cell(row=16, column=18).value),
-        'r13_sales_ly': safe_float(ws.cell(row=16, column=19).value),
-        'r13_sales_diff': safe_float(ws.cell(row=16, column=20).value),
-        'r13_sales_pct': safe_float(ws.cell(row=16, column=21).value),
-    }
+    brand_row = section_rows('brand_total')[0]
+    brand_total = (report_date, *map(safe_float, brand_row[1:21]))  # BRAND_COLS order
 
     # --- Section 2: Transactions by Store (rows 54-61) ---
-    trans_records = []
-    for row_num in range(54, 62):
-        store_name = ws.cell(row=row_num, column=1).value
+    trans_rows = []
+    for row in section_rows('transactions'):
+        store_name = row[0]
         if not store_name or 'Totals' in str(store_name):
             continue
-        trans_records.append({
-            'date': report_date,
-            'store': str(store_name).strip(),
-            'day_trans_ty': safe_int(ws.cell(row=row_num, column=2).value),
-            'day_trans_ly': safe_int(ws.cell(row=row_num, column=3).value),
-            'day_trans_diff': safe_int(ws.cell(row=row_num, column=4).value),
-            'day_trans_pct': safe_float(ws.cell(row=row_num, column=5).value),
-            'wtd_trans_ty': safe_int(ws.cell(row=row_num, column=6).value),
-            'wtd_trans_ly': safe_int(ws.cell(row=row_num, column=7).value),
-            'wtd_trans_diff': safe_int(ws.cell(row=row_num, column=8).value),
-            'wtd_trans_pct': safe_float(ws.cell(row=row_num, column=9).value),
-            'ptd_trans_ty': safe_int(ws.cell(row=row_num, column=10).value),
-            'ptd_trans_ly': safe_int(ws.cell(row=row_num, column=11).value),
-            'ptd_trans_diff': safe_int(ws.cell(row=row_num, column=12).value),
-            'ptd_trans_pct': safe_float(ws.cell(row=row_num, column=13).value),
-            'ytd_trans_ty': safe_int(ws.cell(row=row_num, column=14).value),
-            'ytd_trans_ly': safe_int(ws.cell(row=row_num, column=15).value),
-            'ytd_trans_diff': safe_int(ws.cell(row=row_num, column=16).value),
-            'ytd_trans_pct': safe_float(ws.cell(row=row_num, column=17).value),
-            'r13_trans_ty': safe_int(ws.cell(row=row_num, column=18).value),
-            'r13_trans_ly': safe_int(ws.cell(row=row_num, column=19).value),
-            'r13_trans_diff': safe_int(ws.cell(row=row_num, column=20).value),
-            'r13_trans_pct': safe_float(ws.cell(row=row_num, column=21).value),
-        })
+        trans_rows.append((report_date, store_name,
+                           *[convert(val) for convert, val in zip(TRANSACTIONS_CONVERTERS, row[1:21])]))
+    transactions = _rows_to_columns(TRANSACTIONS_COLS, trans_rows)
 
     # --- Section 3: Channel Mix (rows 66-73) ---
-    channel_records = []
-    for row_num in range(66, 74):
-        store_name = ws.cell(row=row_num, column=1).value
+    channel_rows = []
+    for row in section_rows('channels'):
+        store_name = row[0]
         if not store_name or 'Totals' in str(store_name):
             continue
-        channel_records.append({
-            'date': report_date,
-            'store': str(store_name).strip(),
-            'avg_check_ty': safe_float(ws.cell(row=row_num, column=2).value),
-            'avg_check_ly': safe_float(ws.cell(row=row_num, column=3).value),
-            'avg_check_diff': safe_float(ws.cell(row=row_num, column=4).value),
-            'avg_check_pct': safe_float(ws.cell(row=row_num, column=5).value),
-            'dine_in_sales': safe_float(ws.cell(row=row_num, column=6).value),
-            'dine_in_trans': safe_int(ws.cell(row=row_num, column=7).value),
-            'dine_in_avg_check': safe_float(ws.cell(row=row_num, column=8).value),
-            'dine_in_pct_sales': safe_float(ws.cell(row=row_num, column=9).value),
-            'carry_out_sales': safe_float(ws.cell(row=row_num, column=10).value),
-            'carry_out_trans': safe_int(ws.cell(row=row_num, column=11).value),
-            'carry_out_avg_check': safe_float(ws.cell(row=row_num, column=12).value),
-            'carry_out_pct_sales': safe_float(ws.cell(row=row_num, column=13).value),
-            'delivery_sales': safe_float(ws.cell(row=row_num, column=14).value),
-            'delivery_trans': safe_int(ws.cell(row=row_num, column=15).value),
-            'delivery_avg_check': safe_float(ws.cell(row=row_num, column=16).value),
-            'delivery_pct_sales': safe_float(ws.cell(row=row_num, column=17).value),
-            'drive_thru_sales': safe_float(ws.cell(row=row_num, column=18).value),
-            'drive_thru_trans': safe_int(ws.cell(row=row_num, column=19).value),
-            'drive_thru_avg_check': safe_float(ws.cell(row=row_num, column=20).value),
-            'drive_thru_pct_sales': safe_float(ws.cell(row=row_num, column=21).value),
-        })
+        channel_rows.append((report_date, store_name,
+                             *[convert(val) for convert, val in zip(CHANNELS_CONVERTERS, row[1:21])]))
+    channels = _rows_to_columns(CHANNELS_COLS, channel_rows)
 
     # --- Section 4: Labor & 3rd Party (rows 78-85) ---
-    labor_records = []
-    for row_num in range(78, 86):
-        store_name = ws.cell(row=row_num, column=1).value
+    labor_rows = []
+    for row in section_rows('labor'):
+        store_name = row[0]
         if not store_name or 'Totals' in str(store_name):
             continue
-        labor_records.append({
-            'date': report_date,
-            'store': str(store_name).strip(),
-            'labor_dollars': safe_float(ws.cell(row=row_num, column=2).value),
-            'labor_pct': safe_float(ws.cell(row=row_num, column=3).value),
-            'olo_sales': safe_float(ws.cell(row=row_num, column=4).value),
-            'doordash': safe_float(ws.cell(row=row_num, column=5).value),
-            'ubereats': safe_float(ws.cell(row=row_num, column=6).value),
-            'grubhub': safe_float(ws.cell(row=row_num, column=7).value),
-            'eatstreet': safe_float(ws.cell(row=row_num, column=8).value),
-            'ezcater': safe_float(ws.cell(row=row_num, column=9).value),
-            'total_3rd_party_dollars': safe_float(ws.cell(row=row_num, column=10).value),
-            'total_3rd_party_pct': safe_float(ws.cell(row=row_num, column=11).value),
-        })
-
-    wb.close()
+        labor_rows.append((report_date, store_name, *map(safe_float, row[1:11])))
+    labor = _rows_to_columns(LABOR_COLS, labor_rows)
 
     return {
         'date': report_date,
-        'sales': sales_records,
+        'sales': sales,
         'brand_total': brand_total,
-        'transactions': trans_records,
-        'channels': channel_records,
-        'labor': labor_records,
+        'transactions': transactions,
+        'channels': channels,
+        'labor': labor,
     }
 
 
+# Parsed reports are pickled here, next to the source files
+CACHE_DIRNAME = '.cache'
+# Bump whenever the shape of parse_flash_report's result changes
+CACHE_FORMAT = 1
+
+
+def _cache_path(filepath):
+    """Cache file for `filepath`; the name changes whenever the file does."""
+    stat = os.stat(filepath)
+    name = f"{os.path.basename(filepath)}.{stat.st_mtime_ns}.{stat.st_size}.v{CACHE_FORMAT}.pkl"
+    return os.path.join(os.path.dirname(filepath), CACHE_DIRNAME, name)
+
+
+def _read_cache(filepath):
+    """Return (True, parsed result) on a cache hit, else (False, None)."""
+    try:
+        with open(_cache_path(filepath), 'rb') as f:
+            return True, pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return False, None
+
+
+def _write_cache(filepath, result):
+    """Pickle `result` for `filepath`, dropping cache files of older versions."""
+    cache_path = _cache_path(filepath)
+    cache_dir, name = os.path.split(cache_path)
+    prefix = os.path.basename(filepath) + '.'
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for old in os.listdir(cache_dir):
+            if old.startswith(prefix) and old.endswith('.pkl') and old != name:
+                os.remove(os.path.join(cache_dir, old))
+        with open(cache_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"Could not cache {filepath}: {e}")
+
+
+def parse_flash_report_cached(filepath):
+    """parse_flash_report, reusing the on-disk result while the file is unchanged."""
+    hit, result = _read_cache(filepath)
+    if not hit:
+        result = parse_flash_report(filepath)
+        _write_cache(filepath, result)
+    return result
+
+
+def peek_report_date(filepath):
+    """Read only the report date (cell A2) of a flash report file."""
+    hit, result = _read_cache(filepath)
+    if hit:
+        return result['date'] if result else None
+    return parse_date_from_cell(_read_grid(filepath, max_row=2)[1][0])
+
+
+# Rank of a (filepath, mtime, preferred) candidate: preferred first, then newest
+_PRIORITY = itemgetter(2, 1)
+
+
+def _parse_best(entries):
+    """
+    Parse the highest-ranked file among a date's candidates. A broken winner
+    falls back to the next-best candidate.
+    """
+    candidates = list(entries)
+    while candidates:
+        filepath, _, _ = best = max(candidates, key=_PRIORITY)
+        candidates.remove(best)
+        try:
+            result = parse_flash_report_cached(filepath)
+        except Exception as e:
+            print(f"Error parsing {filepath}: {e}")
+            continue
+        if result is not None:
+            return result
+    return None
+
+
+def _extend_columns(columns, more):
+    """Append every column list in `more` onto the matching list in `columns`."""
+    for col, values in more.items():
+        columns[col].extend(values)
+
+
+def _columns_to_frame(columns, store_dtype):
+    """
+    Build a DataFrame from a dict of column lists (empty frame if no rows),
+    with 'store' as `store_dtype` and the percentage columns as float32.
+    """
+    if not columns['date']:
+        return pd.DataFrame()
+    arrays = {}
+    for col, values in columns.items():
+        if col == 'store':
+            # Names are stripped here, once per column, rather than per row while parsing
+            values = pd.Series(values).astype(str).str.strip().astype(store_dtype)
+        elif '_pct' in col:
+            values = np.array(values, dtype=np.float32)
+        arrays[col] = values
+    return pd.DataFrame(arrays, copy=False)
+
+
+def report_files(folder_path):
+    """
+    (path, os.stat_result) of every flash report .xlsx in `folder_path`, sorted
+    by file name. The one definition of which files count as reports.
+    """
+    files = []
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith('Multibrand_FlashReport') and name.endswith('.xlsx'):
+                files.append((entry.path, entry.stat()))
+    files.sort()
+    return files
+
+
 def load_all_reports(folder_path=None):
     """
     Load all flash report Excel files from the given folder.
@@ -224,65 +465,74 @@ def load_all_reports(folder_path=None):
     # file for a given date, e.g. '[74]' for the 2/21 report.
     PREFERRED_SUFFIXES = {'[74]'}
 
-    pattern = os.path.join(folder_path, 'Multibrand_FlashReport*.xlsx')
-    files = glob.glob(pattern)
+    files = [(path, stat.st_mtime) for path, stat in report_files(folder_path)]
 
-    # ── First pass: parse every file and group by date ──
-    # Each entry: (filepath, mtime, is_preferred, parsed_result)
-    parsed_by_date = {}  # date → list of (filepath, mtime, preferred, result)
+    # ── First pass: read just the date of every file and group by it ──
+    # Parsing stays in-process: with the per-file cache most loads parse
+    # nothing, and worker start-up (re-importing pandas) costs more than it saves.
+    # Each entry: (filepath, mtime, is_preferred)
+    candidates_by_date = {}  # date → list of (filepath, mtime, preferred)
 
-    for filepath in files:
+    for filepath, mtime in files:
         try:
-            result = parse_flash_report(filepath)
-            if result is None:
+            rdate = peek_report_date(filepath)
+            if rdate is None:
                 continue
-            rdate = result['date']
-            mtime = os.path.getmtime(filepath)
             basename = os.path.basename(filepath)
             # Check if this file's bracket suffix is preferred
-            suffix_match = re.search(r'(\[\d+\])', basename)
+            suffix_match = _SUFFIX_RE.search(basename)
             suffix = suffix_match.group(1) if suffix_match else ''
             preferred = suffix in PREFERRED_SUFFIXES
 
-            parsed_by_date.setdefault(rdate, []).append(
-                (filepath, mtime, preferred, result)
+            candidates_by_date.setdefault(rdate, []).append(
+                (filepath, mtime, preferred)
             )
         except Exception as e:
-            print(f"Error parsing {filepath}: {e}")
+            print(f"Error reading {filepath}: {e}")
             continue
 
-    # ── Second pass: pick one file per date ──
-    all_sales = []
-    all_brand_totals = []
-    all_transactions = []
-    all_channels = []
-    all_labor = []
+    # ── Second pass: fully parse only the best file per date ──
+    parsed_by_date = {rdate: _parse_best(entries) for rdate, entries in candidates_by_date.items()}
 
-    for rdate, entries in parsed_by_date.items():
-        # Sort: preferred first, then newest mtime
-        entries.sort(key=lambda e: (e[2], e[1]), reverse=True)
-        winner = entries[0]  # best candidate
-        result = winner[3]
+    # ── Combine the per-date results ──
+    all_sales = {col: [] for col in SALES_COLS}
+    all_brand_totals = []
+    all_transactions = {col: [] for col in TRANSACTIONS_COLS}
+    all_channels = {col: [] for col in CHANNELS_COLS}
+    all_labor = {col: [] for col in LABOR_COLS}
+
+    # Appending in date order leaves every frame sorted by date already
+    for rdate in sorted(parsed_by_date):
+        result = parsed_by_date[rdate]
+        if result is None:
+            continue
 
-        all_sales.extend(result['sales'])
+        _extend_columns(all_sales, result['sales'])
         all_brand_totals.append(result['brand_total'])
-        all_transactions.extend(result['transactions'])
-        all_channels.extend(result['channels'])
-        all_labor.extend(result['labor'])
+        _extend_columns(all_transactions, result['transactions'])
+        _extend_columns(all_channels, result['channels'])
+        _extend_columns(all_labor, result['labor'])
+
+    # One categorical dtype for the (stripped) store column of every section
+    raw_stores = set().union(
+        all_sales['store'], all_transactions['store'], all_channels['store'], all_labor['store']
+    )
+    store_dtype = pd.CategoricalDtype(sorted({str(name).strip() for name in raw_stores}))
+
+    brand_totals = pd.DataFrame()
+    if all_brand_totals:
+        brand_totals = pd.DataFrame.from_records(all_brand_totals, columns=BRAND_COLS).astype(
+            {col: np.float32 for col in BRAND_COLS if '_pct' in col}
+        )
 
     data = {
-        'sales': pd.DataFrame(all_sales) if all_sales else pd.DataFrame(),
-        'brand_totals': pd.DataFrame(all_brand_totals) if all_brand_totals else pd.DataFrame(),
-        'transactions': pd.DataFrame(all_transactions) if all_transactions else pd.DataFrame(),
-        'channels': pd.DataFrame(all_channels) if all_channels else pd.DataFrame(),
-        'labor': pd.DataFrame(all_labor) if all_labor else pd.DataFrame(),
+        'sales': _columns_to_frame(all_sales, store_dtype),
+        'brand_totals': brand_totals,
+        'transactions': _columns_to_frame(all_transactions, store_dtype),
+        'channels': _columns_to_frame(all_channels, store_dtype),
+        'labor': _columns_to_frame(all_labor, store_dtype),
     }
 
-    # Sort by date
-    for key in data:
-        if not data[key].empty and 'date' in data[key].columns:
-            data[key] = data[key].sort_values('date').reset_index(drop=True)
-
     return data
 
 